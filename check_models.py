@@ -3,14 +3,14 @@
 Check which OpenAI models you have access to
 """
 
-import os
-import openai
+import asyncio
+from env import get_env
 
 def check_available_models():
     """Check which OpenAI models are available"""
     
     # Check if API key is set
-    api_key = os.getenv("OPENAI_API_KEY")
+    api_key = get_env("OPENAI_API_KEY")
     if not api_key:
         print("❌ OPENAI_API_KEY environment variable not set!")
         print("\n💡 To set your API key, run:")
@@ -20,7 +20,8 @@ def check_available_models():
     print(f"✅ API key found: {api_key[:10]}...")
     
     try:
-        client = openai.OpenAI(api_key=api_key)
+        import openai
+        client = openai.AsyncOpenAI(api_key=api_key)
         
         # List of models to test
         models_to_test = [
@@ -31,25 +32,32 @@ def check_available_models():
             "gpt-4o-mini"
         ]
         
+        async def _probe(model):
+            return await client.chat.completions.create(
+                model=model,
+                messages=[{"role": "user", "content": "Hello"}],
+                max_tokens=10,
+                temperature=0
+            )
+        
+        async def _probe_all():
+            # The probes are independent, so send them all at once
+            tasks = [asyncio.create_task(_probe(model)) for model in models_to_test]
+            return await asyncio.gather(*tasks, return_exceptions=True)
+        
         print("\n🔍 Checking available models...")
+        results = asyncio.run(_probe_all())
         available_models = []
         
-        for model in models_to_test:
-            try:
-                print(f"   Testing {model}...", end=" ")
-                response = client.chat.completions.create(
-                    model=model,
-                    messages=[{"role": "user", "content": "Hello"}],
-                    max_tokens=10,
-                    temperature=0
-                )
+        for model, result in zip(models_to_test, results):
+            print(f"   Testing {model}...", end=" ")
+            if not isinstance(result, Exception):
                 print("✅ Available")
                 available_models.append(model)
-            except Exception as e:
-                if "model_not_found" in str(e) or "does not exist" in str(e):
-                    print("❌ Not available")
-                else:
-                    print(f"❌ Error: {str(e)[:50]}...")
+            elif "model_not_found" in str(result) or "does not exist" in str(result):
+                print("❌ Not available")
+            else:
+                print(f"❌ Error: {str(result)[:50]}...")
         
         print(f"\n📋 Summary:")
         print(f"   Available models: {len(available_models)}")
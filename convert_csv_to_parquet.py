@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Convert the PDPA sections CSV to Parquet for faster loading
+
+PDPALegalAdvisor reads pdpa_sections.parquet instead of the CSV when it is
+present and at least as new as the CSV. Requires pyarrow.
+"""
+
+import sys
+import pyarrow as pa
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
+
+from pdpa_legal_advisor import PDPA_COLUMNS
+
+def convert(csv_path="pdpa_sections.csv", parquet_path="pdpa_sections.parquet"):
+    """Write the advisor's columns of the CSV to a zstd-compressed Parquet file"""
+    # Keep every column as text so section numbers aren't inferred as integers
+    convert_options = pv.ConvertOptions(
+        column_types={column: pa.string() for column in PDPA_COLUMNS},
+        include_columns=PDPA_COLUMNS,
+    )
+    # Section text spans several lines, which pyarrow only handles when told to
+    parse_options = pv.ParseOptions(newlines_in_values=True)
+    table = pv.read_csv(csv_path, parse_options=parse_options, convert_options=convert_options)
+    pq.write_table(table, parquet_path, compression="zstd")
+    print(f"✅ Wrote {table.num_rows} rows to {parquet_path}")
+
+if __name__ == "__main__":
+    convert(*sys.argv[1:3])
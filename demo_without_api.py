@@ -14,12 +14,12 @@ def demo_basic_functionality():
         # Initialize advisor (this will work without API key for basic functionality)
         print("1. Loading PDPA sections...")
         advisor = PDPALegalAdvisor("pdpa_sections.csv", api_key="demo-key")
-        print(f"   ✅ Loaded {len(advisor.df)} sections from CSV")
+        print(f"   ✅ Loaded {len(advisor._rows)} sections from CSV")
         
         # Show some sample sections
         print("\n2. Sample PDPA sections:")
-        sample_sections = advisor.df.head(5)
-        for _, section in sample_sections.iterrows():
+        sample_sections = list(advisor._by_section.values())[:5]
+        for section in sample_sections:
             print(f"   • Section {section['section_number']}: {section['section_title']}")
         
         # Test fallback section search
@@ -0,0 +1,15 @@
+"""
+Cached access to environment variables
+
+The environment is read once per variable; later lookups, including for
+variables that are not set, come from the cache.
+"""
+
+import functools
+import os
+from typing import Optional
+
+@functools.lru_cache(maxsize=None)
+def get_env(name: str) -> Optional[str]:
+    """Value of an environment variable, or None if it is not set"""
+    return os.environ.get(name)
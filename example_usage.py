@@ -4,8 +4,22 @@ Example usage of the PDPA Legal Advisor
 """
 
 from pdpa_legal_advisor import PDPALegalAdvisor
+import asyncio
 import os
 
+# Maximum scenarios analyzed at once, to stay within OpenAI rate limits
+MAX_CONCURRENT_REQUESTS = 5
+
+async def analyze_scenarios(advisor, scenarios):
+    """Generate legal advice for all scenarios concurrently"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    
+    async def analyze(scenario):
+        async with semaphore:
+            return await advisor.generate_legal_advice_async(scenario)
+    
+    return await asyncio.gather(*[analyze(s) for s in scenarios])
+
 def main():
     """Example usage of the PDPA Legal Advisor"""
     
@@ -29,15 +43,14 @@ def main():
         
         print("✅ Advisor initialized successfully!\n")
         
-        # Test each scenario
-        for i, scenario in enumerate(scenarios, 1):
+        # Analyze all scenarios concurrently, then display them in order
+        advice_list = asyncio.run(analyze_scenarios(advisor, scenarios))
+        
+        for i, (scenario, advice) in enumerate(zip(scenarios, advice_list), 1):
             print(f"📋 SCENARIO {i}:")
             print(f"   {scenario}")
             print("\n" + "="*80 + "\n")
             
-            # Generate legal advice
-            advice = advisor.generate_legal_advice(scenario)
-            
             # Display formatted advice
             print(advisor.format_advice(advice))
             print("\n" + "="*80 + "\n")
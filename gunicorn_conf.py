@@ -0,0 +1,25 @@
+"""
+Gunicorn configuration for serving the PDPA Legal Advisor web interface
+
+Usage:
+    gunicorn -c gunicorn_conf.py web_interface:app
+"""
+
+bind = "127.0.0.1:5000"
+
+# Requests spend most of their time waiting on OpenAI, so each worker
+# serves many of them at once from its thread pool
+workers = 2
+threads = 16
+worker_class = "gthread"
+
+# LLM calls can take well over gunicorn's default 30 second timeout
+timeout = 120
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = True
+
+def when_ready(server):
+    """Build the advisor before forking, so workers share the parsed sections"""
+    import web_interface
+    web_interface.get_advisor()
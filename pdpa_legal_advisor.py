@@ -4,14 +4,279 @@ PDPA Legal Advisor - A ChatGPT wrapper for Singapore Personal Data Protection Ac
 Provides legal advice using IRAC framework based on factual scenarios
 """
 
-import pandas as pd
+import csv
+import pickle
+import numpy as np
 import openai
 import json
 import re
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Iterator, Union
+from dataclasses import dataclass, asdict
 import os
+import sys
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from env import get_env
+
+try:
+    import diskcache
+except ImportError:  # Optional: without it LLM replies are only cached in memory
+    diskcache = None
+
+try:
+    import ahocorasick
+except ImportError:  # Optional: without it keyword checks scan once per keyword
+    ahocorasick = None
+
+# On-disk location of the LLM response cache (used when diskcache is installed)
+LLM_CACHE_DIR = "./.llm_cache"
+# Number of LLM replies also kept in memory, least recently used evicted first
+LLM_MEMORY_CACHE_SIZE = 256
+
+# Semantic cache: scenarios whose embeddings are at least this cosine-similar
+# to a previously answered scenario reuse that scenario's advice
+EMBEDDING_MODEL = "text-embedding-3-small"
+SEMANTIC_CACHE_THRESHOLD = 0.85
+SEMANTIC_CACHE_DIR = Path("./.semantic_cache")
+SEMANTIC_CACHE_FILE = SEMANTIC_CACHE_DIR / "semantic_cache.npz"
+# Oldest entries are dropped beyond this many, bounding per-insert cost
+SEMANTIC_CACHE_SIZE = 512
+# After a failed section-embedding request, searches use TF-IDF for this
+# many seconds before the request is tried again
+SECTION_EMBED_RETRY_SECONDS = 300
+
+# Number of recent scenarios whose generated advice is kept in memory
+ADVICE_CACHE_SIZE = 256
+# Keyword-check results kept for recently seen scenarios
+LEGAL_CHECK_CACHE_SIZE = 1024
+
+# Columns of the PDPA sections data used by the advisor
+PDPA_COLUMNS = ['section_number', 'section_title', 'text']
+
+# Version of the parsed-sections snapshot format and the keys of each row in
+# it; bump the version whenever the row layout changes
+SNAPSHOT_VERSION = 1
+SNAPSHOT_ROW_KEYS = frozenset(['section_number', 'section_title', 'text', 'text_preview'])
+
+# Valid section numbers are plain integers
+_RE_SECTION_NUM = re.compile(r'\d+')
+
+# Length at which section text is truncated for prompts and display
+PREVIEW_CHARS = 1000
+
+# Patterns for pulling the JSON object out of an IRAC reply, most precise first
+_RE_JSON_OBJECTS = [
+    re.compile(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', re.DOTALL),
+    re.compile(r'\{.*\}', re.DOTALL),
+]
+_RE_NAN = re.compile(r'\bNaN\b')
+_RE_UNDEFINED = re.compile(r'\bundefined\b')
+
+# Keywords suggesting a scenario concerns legal/data protection issues
+LEGAL_KEYWORDS = (
+    'data', 'personal', 'privacy', 'consent', 'collection', 'disclosure',
+    'breach', 'access', 'correction', 'retention', 'protection', 'purpose',
+    'organization', 'individual', 'customer', 'client', 'employee', 'user',
+    'information', 'records', 'database', 'processing', 'storage', 'transfer',
+    'compliance', 'policy', 'procedure', 'notification', 'request', 'rights',
+    'unauthorized', 'security', 'confidential', 'sensitive', 'identifiable',
+    'pdp', 'gdpr', 'regulation', 'law', 'legal', 'statute', 'act',
+    'company', 'business', 'organization', 'entity', 'corporation'
+)
+
+# Keywords suggesting obviously non-legal content
+NON_LEGAL_INDICATORS = (
+    'chocolate', 'labubu', 'matcha', 'food', 'recipe', 'cooking',
+    'gaming', 'game', 'entertainment', 'music', 'movie', 'book',
+    'weather', 'sports', 'travel', 'vacation', 'hobby', 'art',
+    'random', 'joke', 'meme', 'funny', 'test', 'hello', 'hi'
+)
+
+def _build_automaton(keywords):
+    """
+    Build an Aho-Corasick automaton matching all keywords in one pass
+    
+    Each keyword maps to how many times it appears in the list, so counts
+    match the per-keyword scan for lists with repeated entries.
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in set(keywords):
+        automaton.add_word(keyword, (keyword, keywords.count(keyword)))
+    automaton.make_automaton()
+    return automaton
+
+_LEGAL_AUTOMATON = _build_automaton(LEGAL_KEYWORDS)
+_NON_LEGAL_AUTOMATON = _build_automaton(NON_LEGAL_INDICATORS)
+
+def _count_keywords(text: str, keywords, automaton) -> int:
+    """Count the keyword list entries that occur in text (substring matches)"""
+    if automaton is not None:
+        return sum(dict(match for _, match in automaton.iter(text)).values())
+    return sum(1 for keyword in keywords if keyword in text)
+
+def _contains_any(text: str, keywords, automaton) -> bool:
+    """Whether any keyword occurs in text, stopping at the first match"""
+    if automaton is not None:
+        return next(automaton.iter(text), None) is not None
+    return any(keyword in text for keyword in keywords)
+
+
+def _check_legal_scenario(scenario: str) -> tuple[bool, str]:
+    """Keyword check behind PDPALegalAdvisor.is_legal_scenario"""
+    # Convert to lowercase for checking
+    scenario_lower = scenario.lower()
+    
+    # Check if scenario contains legal keywords
+    keyword_count = _count_keywords(scenario_lower, LEGAL_KEYWORDS, _LEGAL_AUTOMATON)
+    
+    # Minimum threshold for legal relevance
+    if keyword_count < 2:
+        return False, "Scenario does not appear to contain legal or data protection related content. Please provide a scenario involving personal data, privacy, or legal compliance issues."
+    
+    # Check for obviously non-legal content
+    if _contains_any(scenario_lower, NON_LEGAL_INDICATORS, _NON_LEGAL_AUTOMATON):
+        if keyword_count < 3:  # Lower threshold if non-legal indicators present
+            return False, "Scenario appears to be non-legal content. Please provide a factual scenario involving data protection, privacy, or legal compliance issues."
+    
+    return True, "Scenario appears to be legal-related."
+
+# Chat models in order of preference
+MODELS_TO_TRY = ["gpt-4o-mini", "gpt-3.5-turbo", "gpt-4"]
+
+# Where the first available chat model is remembered per API key, and for how long
+MODEL_CACHE_PATH = Path.home() / ".pdpa_advisor" / "models.json"
+MODEL_CACHE_TTL = 24 * 60 * 60
+# Serializes updates to the model cache file within this process
+_model_cache_lock = threading.Lock()
+
+# Fixed IRAC instructions, sent as the system message so only the scenario
+# and its sections vary between requests
+IRAC_SYSTEM_PROMPT = """You are a legal expert specializing in Singapore's Personal Data Protection Act 2012.
+Analyze the factual scenario given by the user against the relevant PDPA sections provided, and give legal advice using the IRAC framework:
+
+1. ISSUE: Identify the key legal issues and questions raised by this scenario
+2. RULE: State the relevant legal rules and principles from the PDPA sections
+3. ANALYSIS: Apply the legal rules to the specific facts of the scenario
+4. CONCLUSION: Provide your legal conclusion and recommendations
+
+Also assess:
+- Risk level (Low/Medium/High) and reasoning
+- Specific recommendations for compliance
+- Potential penalties or consequences
+
+Format your response as valid JSON with these exact fields (use null for missing values, not NaN or undefined):
+{
+    "issue": "string",
+    "rule": "string",
+    "analysis": "string",
+    "conclusion": "string",
+    "risk_level": "Low/Medium/High",
+    "recommendations": ["recommendation1", "recommendation2", ...]
+}
+
+IMPORTANT: Ensure all values are valid JSON strings, numbers, or arrays. Do not use NaN, undefined, or other invalid JSON values."""
+
+# Completion budget for an IRAC reply; replies cut off at this limit are
+# treated as errors rather than parsed
+IRAC_MAX_TOKENS = 2000
+
+# Structured-output schema for IRAC replies, guaranteeing parseable JSON
+IRAC_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "legal_advice",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "issue": {"type": "string"},
+                "rule": {"type": "string"},
+                "analysis": {"type": "string"},
+                "conclusion": {"type": "string"},
+                "risk_level": {"type": "string", "enum": ["Low", "Medium", "High"]},
+                "recommendations": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["issue", "rule", "analysis", "conclusion", "risk_level", "recommendations"],
+            "additionalProperties": False
+        }
+    }
+}
+
+# Models in MODELS_TO_TRY that accept json_schema response formats
+STRUCTURED_OUTPUT_MODELS = ("gpt-4o-mini",)
+
+def _format_kwargs(model: str, response_format: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Extra create() arguments applying response_format where the model supports it"""
+    if response_format is None or model not in STRUCTURED_OUTPUT_MODELS:
+        return {}
+    return {"response_format": response_format}
+
+def _check_finish_reason(finish_reason: Optional[str]):
+    """Raise if a chat reply stopped because it ran out of tokens"""
+    if finish_reason == "length":
+        raise Exception("LLM reply was cut off at the token limit")
+
+def _reply_content(response) -> str:
+    """Content of a chat completion, raising if it is missing or incomplete"""
+    choice = response.choices[0]
+    _check_finish_reason(choice.finish_reason)
+    if choice.message.content is None:
+        raise Exception("LLM returned an empty reply")
+    return choice.message.content
+
+def _snapshot_rows(snapshot: Any) -> Optional[List[Dict[str, str]]]:
+    """Rows from a parsed-sections snapshot, or None if it has another version or layout"""
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+        return None
+    rows = snapshot.get('rows')
+    if not isinstance(rows, list):
+        return None
+    for row in rows:
+        if not isinstance(row, dict) or row.keys() != SNAPSHOT_ROW_KEYS:
+            return None
+        if not all(isinstance(value, str) for value in row.values()):
+            return None
+    return rows
+
+def _is_model_unavailable(error: Exception) -> bool:
+    """Whether an API error means the model is not available to this account"""
+    return "model_not_found" in str(error) or "does not exist" in str(error)
+
+def _unit_vector(values: List[float]) -> Optional[np.ndarray]:
+    """Convert an embedding to a unit-norm float32 vector"""
+    vector = np.asarray(values, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else None
+
+# Report layout for format_advice; the sections and recommendations lists are appended after it
+ADVICE_REPORT_HEADER = """
+╔══════════════════════════════════════════════════════════════════════════════╗
+║                           PDPA LEGAL ADVICE REPORT                          ║
+╚══════════════════════════════════════════════════════════════════════════════╝
+
+🔍 ISSUE:
+{issue}
+
+📋 RULE:
+{rule}
+
+🔬 ANALYSIS:
+{analysis}
+
+✅ CONCLUSION:
+{conclusion}
+
+⚠️  RISK LEVEL: {risk_level}
+
+📚 RELEVANT SECTIONS:
+"""
 
 @dataclass
 class LegalAdvice:
@@ -36,111 +301,589 @@ class PDPALegalAdvisor:
             api_key: OpenAI API key (if None, will look for OPENAI_API_KEY env var)
         """
         self.csv_path = csv_path
-        self.df = self._load_pdpa_data()
+        # Section rows in file order, and the first row for each section number
+        self._rows = self._load_pdpa_data()
+        self._by_section = self._index_sections()
+        # Section number of each row as an array, for vectorized lookups by row index
+        self._section_numbers = np.array([row['section_number'] for row in self._rows], dtype=object)
+        # TF-IDF index over the sections, fitted on first fallback search
+        self._tfidf_index = None
+        self._tfidf_lock = threading.Lock()
         self.client = self._setup_openai_client(api_key)
+        # Chat model known to be available, so calls skip unavailable ones
+        self._chat_model = self._load_chat_model()
+        # Exact-match cache of LLM replies: in-memory LRU first, disk fallback
+        self._llm_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._llm_cache_lock = threading.Lock()
+        self._disk_cache = diskcache.Cache(LLM_CACHE_DIR) if diskcache else None
+        # Semantic cache: unit-norm scenario embeddings (one row per entry)
+        # with the advice generated for each, kept in parallel and only
+        # read or replaced together under the lock
+        self._semantic_embs: Optional[np.ndarray] = None
+        self._semantic_advice: List[LegalAdvice] = []
+        self._semantic_lock = threading.Lock()
+        self._load_semantic_cache()
+        # Advice for recently analyzed scenarios, keyed on a digest of the
+        # normalized scenario text and kept in least-recently-used order
+        self._advice_cache: "OrderedDict[str, LegalAdvice]" = OrderedDict()
+        self._advice_cache_lock = threading.Lock()
+        # Keyword-check results under the same digest keys, in LRU order
+        self._legal_check_cache: "OrderedDict[str, tuple[bool, str]]" = OrderedDict()
+        self._legal_check_lock = threading.Lock()
+        # Unit-norm section embeddings for retrieval, one row per section row;
+        # computed on first use when not already saved
+        self._section_texts = self._section_embedding_inputs()
+        self._section_embs = self._load_section_embeddings()
+        # Only one request embeds the sections at a time; concurrent callers
+        # wait for it, and a failure pauses retries until _section_embs_retry_at
+        self._section_embs_lock = threading.Lock()
+        self._section_embs_task: Optional[asyncio.Task] = None
+        self._section_embs_retry_at = 0.0
+        
+    def _load_pdpa_data(self) -> List[Dict[str, str]]:
+        """Load PDPA sections data, reusing the parsed snapshot while it is current"""
+        cache_path = self.csv_path + '.pkl'
+        try:
+            if os.path.getmtime(cache_path) >= os.path.getmtime(self.csv_path):
+                with open(cache_path, 'rb') as f:
+                    rows = _snapshot_rows(pickle.load(f))
+                if rows is not None:
+                    return rows
+        except Exception:
+            # Unreadable snapshots are simply rebuilt from the CSV
+            pass
         
-    def _load_pdpa_data(self) -> pd.DataFrame:
-        """Load and preprocess PDPA sections data"""
+        rows = self._parse_pdpa_csv()
+        # Write to a private temporary file and swap it in, so processes
+        # starting at the same time never read a partly written snapshot
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
         try:
-            df = pd.read_csv(self.csv_path)
-            # Clean and filter the data
-            df = df.dropna(subset=['section_number'])
-            df['section_number'] = df['section_number'].astype(str)
-            # Remove empty or invalid sections
-            df = df[df['section_number'].str.match(r'^\d+$')]
-            return df
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'version': SNAPSHOT_VERSION, 'rows': rows}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"Error saving parsed PDPA data: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        return rows
+    
+    def _parse_pdpa_csv(self) -> List[Dict[str, str]]:
+        """Parse and preprocess the PDPA sections CSV (or its Parquet conversion)"""
+        try:
+            rows = []
+            for row in self._read_section_records():
+                # Remove empty or invalid sections
+                section_number = (row.get('section_number') or '').strip()
+                if not _RE_SECTION_NUM.fullmatch(section_number):
+                    continue
+                text = row.get('text') or ''
+                rows.append({
+                    # Numbers and titles repeat across rows of a section; interning
+                    # shares one string per value, and the pickle snapshot keeps it shared
+                    'section_number': sys.intern(section_number),
+                    'section_title': sys.intern(row.get('section_title') or ''),
+                    'text': text,
+                    # Truncated text used in prompts and display, computed once here
+                    'text_preview': text[:PREVIEW_CHARS] + "..." if len(text) > PREVIEW_CHARS else text
+                })
+            return rows
         except Exception as e:
             raise Exception(f"Error loading PDPA data: {e}")
     
+    def _read_section_records(self) -> List[Dict[str, Optional[str]]]:
+        """
+        Read the raw section records, preferring an up-to-date Parquet copy of the CSV
+        
+        The Parquet copy (same path with a .parquet suffix) is written by
+        convert_csv_to_parquet.py and is only used when pyarrow is installed.
+        """
+        parquet_path = Path(self.csv_path).with_suffix('.parquet')
+        try:
+            use_parquet = os.path.getmtime(parquet_path) >= os.path.getmtime(self.csv_path)
+        except OSError:
+            use_parquet = False
+        if use_parquet:
+            try:
+                # Imported here so CSV-only setups don't pay pyarrow's import time
+                import pyarrow.parquet as pq
+            except ImportError:
+                pass
+            else:
+                return pq.read_table(parquet_path, columns=PDPA_COLUMNS).to_pylist()
+        
+        with open(self.csv_path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            # Pick the needed columns by position rather than building a
+            # dict of every column for each row
+            header = next(reader, [])
+            number_col, title_col, text_col = (header.index(column) for column in PDPA_COLUMNS)
+            width = max(number_col, title_col, text_col) + 1
+            records = []
+            for row in reader:
+                if len(row) < width:
+                    row += [''] * (width - len(row))
+                records.append({
+                    'section_number': row[number_col],
+                    'section_title': row[title_col],
+                    'text': row[text_col],
+                })
+            return records
+    
+    def _index_sections(self) -> Dict[str, Dict[str, str]]:
+        """Index section rows by section number"""
+        by_section: Dict[str, Dict[str, str]] = {}
+        for row in self._rows:
+            # Some section numbers span several rows; lookups use the first
+            by_section.setdefault(row['section_number'], row)
+        return by_section
+    
+    def _summarize_section(self, section: Dict[str, str]) -> Dict[str, str]:
+        """Section metadata with the text truncated for prompts and display"""
+        return {
+            'section_number': section['section_number'],
+            'title': section['section_title'],
+            'text': section['text_preview']
+        }
+    
+    def _build_section_index(self):
+        """
+        Fit a TF-IDF index over section titles and text for local retrieval
+        
+        Returns:
+            Tuple of (vectorizer, document vectors), or (None, None) if the
+            sections contain no indexable terms
+        """
+        # Imported here: scikit-learn (and the pandas it loads) is only needed
+        # once ranking falls back to TF-IDF, and it doubles import time
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
+        documents = [f"{row['section_title']} {row['text']}" for row in self._rows]
+        tfidf = TfidfVectorizer(stop_words='english', sublinear_tf=True)
+        try:
+            # Column-major, so each term's column is its posting list of matching rows
+            doc_vecs = tfidf.fit_transform(documents).tocsc()
+        except ValueError:  # No rows, or no terms beyond stop words
+            return None, None
+        return tfidf, doc_vecs
+    
+    def _section_index(self):
+        """The TF-IDF index, fitted once on first use"""
+        with self._tfidf_lock:
+            if self._tfidf_index is None:
+                self._tfidf_index = self._build_section_index()
+            return self._tfidf_index
+    
     def _setup_openai_client(self, api_key: Optional[str] = None):
         """Setup OpenAI client"""
-        if api_key:
-            self.client = openai.OpenAI(api_key=api_key)
-        elif os.getenv("OPENAI_API_KEY"):
-            self.client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        else:
+        if not api_key:
+            api_key = get_env("OPENAI_API_KEY")
+        if not api_key:
             raise ValueError("OpenAI API key not provided. Set OPENAI_API_KEY environment variable or pass api_key parameter.")
         
+        self.client = openai.OpenAI(api_key=api_key)
+        self.async_client = openai.AsyncOpenAI(api_key=api_key)
+        # Identifies the account in the model cache without storing the key
+        self._account_key = hashlib.sha256(api_key.encode()).hexdigest()[:16]
         return self.client
     
-    def search_relevant_sections(self, scenario: str, top_k: int = 10) -> List[Dict[str, str]]:
+    def _load_chat_model(self) -> Optional[str]:
+        """Return the chat model resolved for this API key within MODEL_CACHE_TTL, if any"""
+        try:
+            with open(MODEL_CACHE_PATH, encoding="utf-8") as f:
+                entry = json.load(f).get(self._account_key)
+            if time.time() - entry['resolved_at'] < MODEL_CACHE_TTL and entry['model'] in MODELS_TO_TRY:
+                return entry['model']
+        except (OSError, ValueError, AttributeError, TypeError, KeyError):
+            pass
+        return None
+    
+    def _remember_chat_model(self, model: str):
+        """Record the chat model that answered, so later calls try it first"""
+        if model == self._chat_model:
+            return
+        self._chat_model = model
+        with _model_cache_lock:
+            try:
+                with open(MODEL_CACHE_PATH, encoding="utf-8") as f:
+                    models = json.load(f)
+            except (OSError, ValueError):
+                models = {}
+            if not isinstance(models, dict):
+                models = {}
+            models[self._account_key] = {'model': model, 'resolved_at': time.time()}
+            # Swapped in whole, so concurrent writers never leave a truncated file
+            tmp_path = f"{MODEL_CACHE_PATH}.{os.getpid()}.tmp"
+            try:
+                MODEL_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(models, f)
+                os.replace(tmp_path, MODEL_CACHE_PATH)
+            except OSError as e:
+                print(f"Error saving model cache: {e}")
+    
+    def _models_to_try(self) -> List[str]:
+        """Chat models in the order to try them, starting with the resolved one"""
+        if self._chat_model is None:
+            return MODELS_TO_TRY
+        return [self._chat_model] + [m for m in MODELS_TO_TRY if m != self._chat_model]
+    
+    def _cache_key(self, model: str, messages: List[Dict[str, str]], max_tokens: int, extra: Dict[str, Any]) -> str:
+        """Key identifying a chat request in the LLM response cache"""
+        request = json.dumps([model, max_tokens, extra, messages], sort_keys=True)
+        return hashlib.sha256(request.encode()).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Look up a cached reply, in memory first and then on disk"""
+        with self._llm_cache_lock:
+            content = self._llm_cache.get(key)
+            if content is not None:
+                self._llm_cache.move_to_end(key)
+                return content
+        if self._disk_cache is not None:
+            content = self._disk_cache.get(key)
+            if content is not None:
+                self._remember_reply(key, content)
+        return content
+    
+    def _remember_reply(self, key: str, content: str):
+        """Keep a reply in memory, evicting the least recently used one when full"""
+        with self._llm_cache_lock:
+            self._llm_cache[key] = content
+            self._llm_cache.move_to_end(key)
+            if len(self._llm_cache) > LLM_MEMORY_CACHE_SIZE:
+                self._llm_cache.popitem(last=False)
+    
+    def _cache_put(self, key: str, content: Optional[str]):
+        """Store a reply in the LLM response cache; empty replies are not cached"""
+        if content is None:
+            return
+        self._remember_reply(key, content)
+        if self._disk_cache is not None:
+            self._disk_cache.set(key, content)
+    
+    def _cached_chat(self, model: str, messages: List[Dict[str, str]], max_tokens: int,
+                     response_format: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Send a chat completion, serving repeated requests from cache
+        
+        Args:
+            model: Model to query
+            messages: Chat messages to send
+            max_tokens: Completion token limit
+            response_format: Structured-output format, used if the model supports it
+            
+        Returns:
+            The reply content
+        """
+        extra = _format_kwargs(model, response_format)
+        key = self._cache_key(model, messages, max_tokens, extra)
+        content = self._cache_get(key)
+        if content is None:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=max_tokens,
+                **extra
+            )
+            content = _reply_content(response)
+            self._cache_put(key, content)
+        return content
+    
+    async def _cached_chat_async(self, model: str, messages: List[Dict[str, str]], max_tokens: int,
+                                 response_format: Optional[Dict[str, Any]] = None) -> str:
+        """Async version of _cached_chat"""
+        extra = _format_kwargs(model, response_format)
+        key = self._cache_key(model, messages, max_tokens, extra)
+        content = self._cache_get(key)
+        if content is None:
+            response = await self.async_client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=max_tokens,
+                **extra
+            )
+            content = _reply_content(response)
+            self._cache_put(key, content)
+        return content
+    
+    def _chat(self, messages: List[Dict[str, str]], max_tokens: int,
+              response_format: Optional[Dict[str, Any]] = None) -> str:
+        """Send chat messages to the first available model in MODELS_TO_TRY"""
+        for model in self._models_to_try():
+            try:
+                content = self._cached_chat(model, messages, max_tokens, response_format)
+            except Exception as e:
+                if not _is_model_unavailable(e):
+                    raise
+                print(f"Model {model} not available, trying next...")
+                continue
+            self._remember_chat_model(model)
+            return content
+        raise Exception("No available models found")
+    
+    async def _chat_async(self, messages: List[Dict[str, str]], max_tokens: int,
+                          response_format: Optional[Dict[str, Any]] = None) -> str:
+        """Async version of _chat"""
+        for model in self._models_to_try():
+            try:
+                content = await self._cached_chat_async(model, messages, max_tokens, response_format)
+            except Exception as e:
+                if not _is_model_unavailable(e):
+                    raise
+                print(f"Model {model} not available, trying next...")
+                continue
+            self._remember_chat_model(model)
+            return content
+        raise Exception("No available models found")
+    
+    def _chat_stream(self, messages: List[Dict[str, str]], max_tokens: int,
+                     response_format: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Streaming version of _chat, yielding the reply as it arrives"""
+        for model in self._models_to_try():
+            extra = _format_kwargs(model, response_format)
+            key = self._cache_key(model, messages, max_tokens, extra)
+            content = self._cache_get(key)
+            if content is not None:
+                yield content
+                return
+            try:
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=0.1,
+                    max_tokens=max_tokens,
+                    stream=True,
+                    **extra
+                )
+            except Exception as e:
+                if not _is_model_unavailable(e):
+                    raise
+                print(f"Model {model} not available, trying next...")
+                continue
+            self._remember_chat_model(model)
+            parts = []
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                # Incomplete replies are neither returned as finished nor cached
+                _check_finish_reason(chunk.choices[0].finish_reason)
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+            if not parts:
+                raise Exception("LLM returned an empty reply")
+            self._cache_put(key, "".join(parts))
+            return
+        raise Exception("No available models found")
+    
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Embed text as a unit-norm vector, or return None if embedding fails"""
+        try:
+            response = self.client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+        except Exception as e:
+            print(f"Error embedding text: {e}")
+            return None
+        return _unit_vector(response.data[0].embedding)
+    
+    async def _embed_async(self, text: str) -> Optional[np.ndarray]:
+        """Async version of _embed"""
+        try:
+            response = await self.async_client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+        except Exception as e:
+            print(f"Error embedding text: {e}")
+            return None
+        return _unit_vector(response.data[0].embedding)
+    
+    def _section_embedding_inputs(self) -> List[str]:
+        """Text embedded for each section row when ranking by embedding"""
+        return [
+            f"Section {row['section_number']}: {row['section_title']}\n{row['text_preview']}"
+            for row in self._rows
+        ]
+    
+    def _section_embeddings_path(self) -> Path:
+        """File holding the section embeddings for the current section texts"""
+        digest = hashlib.sha256(f"{EMBEDDING_MODEL}\n".encode() + "\0".join(self._section_texts).encode()).hexdigest()
+        return SEMANTIC_CACHE_DIR / f"sections-{digest[:16]}.npy"
+    
+    def _load_section_embeddings(self) -> Optional[np.ndarray]:
+        """Load previously computed section embeddings, if any"""
+        try:
+            embs = np.load(self._section_embeddings_path())
+        except (OSError, ValueError):
+            return None
+        return embs if embs.ndim == 2 and len(embs) == len(self._section_texts) else None
+    
+    def _set_section_embeddings(self, vectors: List[List[float]]):
+        """Normalize and save a freshly computed batch of section embeddings"""
+        embs = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(embs, axis=1, keepdims=True)
+        self._section_embs = embs / np.where(norms == 0, 1, norms)
+        try:
+            SEMANTIC_CACHE_DIR.mkdir(exist_ok=True)
+            np.save(self._section_embeddings_path(), self._section_embs)
+        except OSError as e:
+            print(f"Error saving section embeddings: {e}")
+    
+    def _section_embeddings_due(self) -> bool:
+        """Whether the sections still need embedding and a request may be sent now"""
+        return (self._section_embs is None and bool(self._section_texts)
+                and time.monotonic() >= self._section_embs_retry_at)
+    
+    def _section_embeddings_failed(self, error: Exception):
+        """Record a failed section-embedding request so it isn't retried right away"""
+        print(f"Error embedding sections: {error}")
+        self._section_embs_retry_at = time.monotonic() + SECTION_EMBED_RETRY_SECONDS
+    
+    def _embed_sections(self):
+        """Embed every section in one batched request, unless already done"""
+        if not self._section_embeddings_due():
+            return
+        with self._section_embs_lock:
+            # Another thread may have finished (or failed) while this one waited
+            if not self._section_embeddings_due():
+                return
+            try:
+                response = self.client.embeddings.create(model=EMBEDDING_MODEL, input=self._section_texts)
+            except Exception as e:
+                self._section_embeddings_failed(e)
+                return
+            self._set_section_embeddings([item.embedding for item in response.data])
+    
+    async def _request_section_embeddings_async(self):
+        """Send the batched section-embedding request from the event loop"""
+        try:
+            response = await self.async_client.embeddings.create(model=EMBEDDING_MODEL, input=self._section_texts)
+        except Exception as e:
+            self._section_embeddings_failed(e)
+            return
+        self._set_section_embeddings([item.embedding for item in response.data])
+    
+    async def _embed_sections_async(self):
+        """Async version of _embed_sections; concurrent tasks share one request"""
+        if not self._section_embeddings_due():
+            return
+        loop = asyncio.get_running_loop()
+        task = self._section_embs_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self._request_section_embeddings_async())
+            self._section_embs_task = task
+        # Shielded so a cancelled caller doesn't cancel the request for the others
+        await asyncio.shield(task)
+    
+    def _embed_scenario(self, scenario: str) -> Optional[np.ndarray]:
+        """Embed a scenario, embedding the sections alongside it on first use"""
+        if not self._section_embeddings_due():
+            return self._embed(scenario)
+        # Both are independent network requests, so overlap them
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            scenario_future = executor.submit(self._embed, scenario)
+            executor.submit(self._embed_sections)
+        return scenario_future.result()
+    
+    async def _embed_scenario_async(self, scenario: str) -> Optional[np.ndarray]:
+        """Async version of _embed_scenario"""
+        if not self._section_embeddings_due():
+            return await self._embed_async(scenario)
+        embedding, _ = await asyncio.gather(self._embed_async(scenario), self._embed_sections_async())
+        return embedding
+    
+    def _load_semantic_cache(self):
+        """Load the persisted semantic cache, if any"""
+        try:
+            with np.load(SEMANTIC_CACHE_FILE) as data:
+                embs = data["embeddings"]
+                advice = [LegalAdvice(**entry) for entry in json.loads(str(data["advice"]))]
+        except (OSError, KeyError, ValueError, TypeError):
+            return
+        if embs.ndim == 2 and len(embs) == len(advice):
+            self._semantic_embs = embs
+            self._semantic_advice = advice
+    
+    def _lookup_semantic_cache(self, embedding: Optional[np.ndarray]) -> Optional[LegalAdvice]:
+        """Return cached advice for the most similar prior scenario above the threshold"""
+        if embedding is None:
+            return None
+        with self._semantic_lock:
+            embs, advice = self._semantic_embs, self._semantic_advice
+        if embs is None or embs.shape[1] != embedding.shape[0]:
+            return None
+        # Rows are unit-norm, so one matrix-vector product gives every cosine
+        similarities = embs @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] >= SEMANTIC_CACHE_THRESHOLD:
+            return advice[best]
+        return None
+    
+    def _store_semantic_cache(self, embedding: Optional[np.ndarray], advice: LegalAdvice):
+        """Add advice to the semantic cache and persist it"""
+        if embedding is None:
+            return
+        with self._semantic_lock:
+            if self._semantic_embs is None or self._semantic_embs.shape[1] != embedding.shape[0]:
+                embs, entries = embedding[np.newaxis, :], [advice]
+            else:
+                # New arrays rather than in-place appends, so lookups holding the
+                # previous pair keep a consistent view
+                keep = SEMANTIC_CACHE_SIZE - 1
+                embs = np.vstack([self._semantic_embs[-keep:], embedding])
+                entries = self._semantic_advice[-keep:] + [advice]
+            self._semantic_embs, self._semantic_advice = embs, entries
+            # Both parts go in one file, replaced atomically, so readers in
+            # other processes never pair one writer's embeddings with another's advice
+            tmp_path = f"{SEMANTIC_CACHE_FILE}.{os.getpid()}.tmp"
+            try:
+                SEMANTIC_CACHE_DIR.mkdir(exist_ok=True)
+                with open(tmp_path, "wb") as f:
+                    np.savez(f, embeddings=embs, advice=np.array(json.dumps([asdict(a) for a in entries])))
+                os.replace(tmp_path, SEMANTIC_CACHE_FILE)
+            except OSError as e:
+                print(f"Error saving semantic cache: {e}")
+    
+    def search_relevant_sections(self, scenario: str, top_k: int = 10,
+                                 scenario_embedding: Optional[np.ndarray] = None) -> List[Dict[str, str]]:
         """
         Search for relevant PDPA sections based on factual scenario
         
         Args:
             scenario: The factual scenario to analyze
             top_k: Number of most relevant sections to return
+            scenario_embedding: Unit-norm embedding of the scenario; when given and
+                section embeddings are available, sections are ranked by embedding
+                similarity instead of TF-IDF
             
         Returns:
             List of relevant sections with metadata
         """
-        # Use OpenAI to identify relevant sections
-        search_prompt = f"""
-        Given this factual scenario about data protection: "{scenario}"
-        
-        Analyze the scenario and identify which sections of the Singapore Personal Data Protection Act 2012 are most relevant.
-        
-        Consider these key areas:
-        - Data collection and consent (Sections 11-20)
-        - Purpose limitation (Sections 18-20)
-        - Accuracy and correction (Sections 21-22)
-        - Protection and retention (Sections 23-26)
-        - Access and correction rights (Sections 21-22)
-        - Data breach notification (Sections 26A-26D)
-        - Do Not Call Registry (Sections 36-48)
-        - Offences and penalties (Sections 48C-48F)
-        
-        Return a JSON list of section numbers that are most relevant, ordered by relevance.
-        Format: ["section_number1", "section_number2", ...]
-        """
-        
         try:
-            # Try models in order of preference
-            models_to_try = ["gpt-4o-mini", "gpt-3.5-turbo", "gpt-4"]
-            response = None
-            
-            for model in models_to_try:
-                try:
-                    response = self.client.chat.completions.create(
-                        model=model,
-                        messages=[{"role": "user", "content": search_prompt}],
-                        temperature=0.1,
-                        max_tokens=500
-                    )
-                    break
-                except Exception as e:
-                    if "model_not_found" in str(e) or "does not exist" in str(e):
-                        print(f"Model {model} not available, trying next...")
-                        continue
-                    else:
-                        raise e
-            
-            if response is None:
-                raise Exception("No available models found")
-            
-            # Parse the response to get section numbers
-            content = response.choices[0].message.content.strip()
-            # Extract JSON from response
-            json_match = re.search(r'\[.*\]', content, re.DOTALL)
-            if json_match:
-                section_numbers = json.loads(json_match.group())
+            if not self._rows:
+                return self._get_fallback_sections()
+            # Both rankings are cosine similarities over L2-normalized rows
+            if (scenario_embedding is not None and self._section_embs is not None
+                    and self._section_embs.shape[1] == scenario_embedding.shape[0]):
+                scores = self._section_embs @ scenario_embedding
             else:
-                # Fallback: extract numbers from text
-                section_numbers = re.findall(r'\b\d+\b', content)
-            
-            # Get the actual section data
-            relevant_sections = []
-            for section_num in section_numbers[:top_k]:
-                section_data = self.df[self.df['section_number'] == section_num]
-                if not section_data.empty:
-                    section = section_data.iloc[0]
-                    relevant_sections.append({
-                        'section_number': section['section_number'],
-                        'title': section['section_title'],
-                        'text': section['text'][:1000] + "..." if len(str(section['text'])) > 1000 else section['text']
-                    })
-            
-            return relevant_sections
+                tfidf, doc_vecs = self._section_index()
+                if tfidf is None:
+                    return self._get_fallback_sections()
+                # Only the posting lists of the scenario's own terms are scored
+                query = tfidf.transform([scenario])
+                scores = doc_vecs[:, query.indices] @ query.data
+            # Rank every matching row; some section numbers span several rows,
+            # so keep the best-scoring one before taking the top_k sections
+            ranked = np.argsort(-scores, kind='stable')
+            ranked = ranked[scores[ranked] > 0]
+            if not len(ranked):
+                return self._get_fallback_sections()
+            _, first = np.unique(self._section_numbers[ranked], return_index=True)
+            top = ranked[np.sort(first)][:top_k]
+            return [self._summarize_section(self._rows[i]) for i in top]
             
         except Exception as e:
             print(f"Error in section search: {e}")
@@ -152,16 +895,34 @@ class PDPALegalAdvisor:
         common_sections = ['11', '12', '13', '14', '15', '18', '19', '20', '21', '22']
         sections = []
         for section_num in common_sections:
-            section_data = self.df[self.df['section_number'] == section_num]
-            if not section_data.empty:
-                section = section_data.iloc[0]
-                sections.append({
-                    'section_number': section['section_number'],
-                    'title': section['section_title'],
-                    'text': section['text'][:1000] + "..." if len(str(section['text'])) > 1000 else section['text']
-                })
+            section = self._by_section.get(section_num)
+            if section is not None:
+                sections.append(self._summarize_section(section))
         return sections
     
+    def _advice_cache_key(self, scenario: str) -> str:
+        """Key for a scenario in the advice cache, ignoring case and whitespace differences"""
+        normalized = " ".join(scenario.split()).lower()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    
+    def _advice_cache_get(self, scenario: str) -> Optional[LegalAdvice]:
+        """Advice previously generated for this scenario, if still cached"""
+        key = self._advice_cache_key(scenario)
+        with self._advice_cache_lock:
+            advice = self._advice_cache.get(key)
+            if advice is not None:
+                self._advice_cache.move_to_end(key)
+            return advice
+    
+    def _advice_cache_put(self, scenario: str, advice: LegalAdvice) -> None:
+        """Remember advice for a scenario, evicting the least recently used entry when full"""
+        key = self._advice_cache_key(scenario)
+        with self._advice_cache_lock:
+            self._advice_cache[key] = advice
+            self._advice_cache.move_to_end(key)
+            if len(self._advice_cache) > ADVICE_CACHE_SIZE:
+                self._advice_cache.popitem(last=False)
+    
     def is_legal_scenario(self, scenario: str) -> tuple[bool, str]:
         """
         Check if the scenario is related to legal/data protection issues
@@ -172,41 +933,20 @@ class PDPALegalAdvisor:
         Returns:
             Tuple of (is_legal, reason)
         """
-        # Convert to lowercase for checking
-        scenario_lower = scenario.lower()
-        
-        # Legal/data protection keywords
-        legal_keywords = [
-            'data', 'personal', 'privacy', 'consent', 'collection', 'disclosure',
-            'breach', 'access', 'correction', 'retention', 'protection', 'purpose',
-            'organization', 'individual', 'customer', 'client', 'employee', 'user',
-            'information', 'records', 'database', 'processing', 'storage', 'transfer',
-            'compliance', 'policy', 'procedure', 'notification', 'request', 'rights',
-            'unauthorized', 'security', 'confidential', 'sensitive', 'identifiable',
-            'pdp', 'gdpr', 'regulation', 'law', 'legal', 'statute', 'act',
-            'company', 'business', 'organization', 'entity', 'corporation'
-        ]
-        
-        # Check if scenario contains legal keywords
-        keyword_count = sum(1 for keyword in legal_keywords if keyword in scenario_lower)
-        
-        # Minimum threshold for legal relevance
-        if keyword_count < 2:
-            return False, "Scenario does not appear to contain legal or data protection related content. Please provide a scenario involving personal data, privacy, or legal compliance issues."
-        
-        # Check for obviously non-legal content
-        non_legal_indicators = [
-            'chocolate', 'labubu', 'matcha', 'food', 'recipe', 'cooking',
-            'gaming', 'game', 'entertainment', 'music', 'movie', 'book',
-            'weather', 'sports', 'travel', 'vacation', 'hobby', 'art',
-            'random', 'joke', 'meme', 'funny', 'test', 'hello', 'hi'
-        ]
-        
-        if any(indicator in scenario_lower for indicator in non_legal_indicators):
-            if keyword_count < 3:  # Lower threshold if non-legal indicators present
-                return False, "Scenario appears to be non-legal content. Please provide a factual scenario involving data protection, privacy, or legal compliance issues."
-        
-        return True, "Scenario appears to be legal-related."
+        # Keywords never contain whitespace, so the advice cache's normalized
+        # digest gives the same result while keeping entries small
+        key = self._advice_cache_key(scenario)
+        with self._legal_check_lock:
+            result = self._legal_check_cache.get(key)
+            if result is not None:
+                self._legal_check_cache.move_to_end(key)
+                return result
+        result = _check_legal_scenario(scenario)
+        with self._legal_check_lock:
+            self._legal_check_cache[key] = result
+            if len(self._legal_check_cache) > LEGAL_CHECK_CACHE_SIZE:
+                self._legal_check_cache.popitem(last=False)
+        return result
 
     def generate_legal_advice(self, scenario: str) -> LegalAdvice:
         """
@@ -221,20 +961,121 @@ class PDPALegalAdvisor:
         # First check if this is a legal scenario
         is_legal, reason = self.is_legal_scenario(scenario)
         if not is_legal:
-            return LegalAdvice(
-                issue="Input validation failed",
-                rule="The PDPA Legal Advisor is designed for data protection and privacy law scenarios only",
-                analysis=reason,
-                conclusion="Please provide a scenario involving personal data, privacy, or legal compliance issues.",
-                relevant_sections=[],
-                risk_level="N/A",
-                recommendations=["Provide a legal scenario involving data protection", "Include details about personal data handling", "Describe privacy or compliance concerns"]
-            )
+            return self._create_invalid_scenario_advice(reason)
+        
+        # Repeated scenarios are answered without any API calls
+        cached_advice = self._advice_cache_get(scenario)
+        if cached_advice is not None:
+            return cached_advice
+        
+        # Reuse advice given for a near-identical scenario
+        scenario_embedding = self._embed_scenario(scenario)
+        cached_advice = self._lookup_semantic_cache(scenario_embedding)
+        if cached_advice is not None:
+            self._advice_cache_put(scenario, cached_advice)
+            return cached_advice
         
         # Get relevant sections
-        relevant_sections = self.search_relevant_sections(scenario)
+        relevant_sections = self._clean_sections(self.search_relevant_sections(scenario, scenario_embedding=scenario_embedding))
+        
+        try:
+            content = self._chat(self._build_irac_messages(scenario, relevant_sections), max_tokens=IRAC_MAX_TOKENS,
+                                 response_format=IRAC_RESPONSE_FORMAT)
+            advice = self._parse_advice(content, relevant_sections)
+        except Exception as e:
+            print(f"Error generating legal advice: {e}")
+            return self._create_error_advice(relevant_sections, str(e))
+        
+        self._store_semantic_cache(scenario_embedding, advice)
+        self._advice_cache_put(scenario, advice)
+        return advice
+    
+    async def generate_legal_advice_async(self, scenario: str) -> LegalAdvice:
+        """
+        Async version of generate_legal_advice, for analyzing many scenarios concurrently
+        
+        Args:
+            scenario: The factual scenario to analyze
+            
+        Returns:
+            LegalAdvice object with structured analysis
+        """
+        is_legal, reason = self.is_legal_scenario(scenario)
+        if not is_legal:
+            return self._create_invalid_scenario_advice(reason)
+        
+        cached_advice = self._advice_cache_get(scenario)
+        if cached_advice is not None:
+            return cached_advice
+        
+        scenario_embedding = await self._embed_scenario_async(scenario)
+        cached_advice = self._lookup_semantic_cache(scenario_embedding)
+        if cached_advice is not None:
+            self._advice_cache_put(scenario, cached_advice)
+            return cached_advice
+        
+        relevant_sections = self._clean_sections(self.search_relevant_sections(scenario, scenario_embedding=scenario_embedding))
+        
+        try:
+            content = await self._chat_async(self._build_irac_messages(scenario, relevant_sections), max_tokens=IRAC_MAX_TOKENS,
+                                             response_format=IRAC_RESPONSE_FORMAT)
+            advice = self._parse_advice(content, relevant_sections)
+        except Exception as e:
+            print(f"Error generating legal advice: {e}")
+            return self._create_error_advice(relevant_sections, str(e))
+        
+        self._store_semantic_cache(scenario_embedding, advice)
+        self._advice_cache_put(scenario, advice)
+        return advice
+    
+    def generate_legal_advice_stream(self, scenario: str) -> Iterator[Union[str, LegalAdvice]]:
+        """
+        Generate legal advice, streaming the LLM's reply as it arrives
+        
+        Args:
+            scenario: The factual scenario to analyze
+            
+        Yields:
+            Chunks of the reply text, then the parsed LegalAdvice as the last item
+        """
+        is_legal, reason = self.is_legal_scenario(scenario)
+        if not is_legal:
+            yield self._create_invalid_scenario_advice(reason)
+            return
+        
+        cached_advice = self._advice_cache_get(scenario)
+        if cached_advice is not None:
+            yield cached_advice
+            return
+        
+        scenario_embedding = self._embed_scenario(scenario)
+        cached_advice = self._lookup_semantic_cache(scenario_embedding)
+        if cached_advice is not None:
+            self._advice_cache_put(scenario, cached_advice)
+            yield cached_advice
+            return
+        
+        relevant_sections = self._clean_sections(self.search_relevant_sections(scenario, scenario_embedding=scenario_embedding))
+        
+        try:
+            parts = []
+            messages = self._build_irac_messages(scenario, relevant_sections)
+            for delta in self._chat_stream(messages, max_tokens=IRAC_MAX_TOKENS, response_format=IRAC_RESPONSE_FORMAT):
+                parts.append(delta)
+                yield delta
+            # The reply is only parsed once it is complete
+            advice = self._parse_advice("".join(parts), relevant_sections)
+        except Exception as e:
+            print(f"Error generating legal advice: {e}")
+            yield self._create_error_advice(relevant_sections, str(e))
+            return
         
-        # Clean the relevant sections data
+        self._store_semantic_cache(scenario_embedding, advice)
+        self._advice_cache_put(scenario, advice)
+        yield advice
+    
+    def _clean_sections(self, relevant_sections: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Replace NaN/undefined placeholders in section data"""
         cleaned_sections = []
         for section in relevant_sections:
             cleaned_section = {
@@ -243,167 +1084,110 @@ class PDPALegalAdvisor:
                 'text': str(section.get('text', '')).replace('NaN', 'N/A').replace('nan', 'N/A').replace('undefined', 'N/A')
             }
             cleaned_sections.append(cleaned_section)
-        relevant_sections = cleaned_sections
-        
+        return cleaned_sections
+    
+    def _build_irac_messages(self, scenario: str, relevant_sections: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Chat messages asking the LLM for an IRAC analysis of a scenario"""
         # Prepare context for IRAC analysis
         sections_context = "\n\n".join([
             f"Section {s['section_number']}: {s['title']}\n{s['text']}"
             for s in relevant_sections
         ])
         
-        irac_prompt = f"""
-        You are a legal expert specializing in Singapore's Personal Data Protection Act 2012. 
-        Analyze the following factual scenario and provide legal advice using the IRAC framework.
-        
-        FACTUAL SCENARIO:
-        {scenario}
-        
-        RELEVANT PDPA SECTIONS:
-        {sections_context}
-        
-        Please provide a comprehensive legal analysis using the IRAC framework:
+        return [
+            {"role": "system", "content": IRAC_SYSTEM_PROMPT},
+            {"role": "user", "content": f"FACTUAL SCENARIO:\n{scenario}\n\nRELEVANT PDPA SECTIONS:\n{sections_context}"}
+        ]
+    
+    def _parse_advice(self, content: str, relevant_sections: List[Dict[str, str]]) -> LegalAdvice:
+        """Parse the LLM's IRAC reply into a LegalAdvice"""
+        content = content.strip()
         
-        1. ISSUE: Identify the key legal issues and questions raised by this scenario
-        2. RULE: State the relevant legal rules and principles from the PDPA sections
-        3. ANALYSIS: Apply the legal rules to the specific facts of the scenario
-        4. CONCLUSION: Provide your legal conclusion and recommendations
+        # Structured outputs return bare JSON; other models may wrap it in prose
+        try:
+            advice_data = json.loads(content, parse_constant=lambda _: None)
+        except json.JSONDecodeError:
+            advice_data = self._extract_json(content)
         
-        Also assess:
-        - Risk level (Low/Medium/High) and reasoning
-        - Specific recommendations for compliance
-        - Potential penalties or consequences
+        # If no JSON could be parsed, use fallback
+        if advice_data is None:
+            print("Using fallback response parsing")
+            advice_data = self._parse_fallback_response(content)
         
-        Format your response as valid JSON with these exact fields (use null for missing values, not NaN or undefined):
-        {{
-            "issue": "string",
-            "rule": "string", 
-            "analysis": "string",
-            "conclusion": "string",
-            "risk_level": "Low/Medium/High",
-            "recommendations": ["recommendation1", "recommendation2", ...]
-        }}
+        # Clean and validate the advice data
+        def clean_text(text):
+            if text is None or text == 'NaN' or text == 'undefined' or str(text).strip() == '':
+                return 'Information not available'
+            # Clean the text thoroughly
+            cleaned = str(text).replace('NaN', 'N/A').replace('undefined', 'N/A').strip()
+            return cleaned if cleaned else 'Information not available'
         
-        IMPORTANT: Ensure all values are valid JSON strings, numbers, or arrays. Do not use NaN, undefined, or other invalid JSON values.
-        """
+        def clean_list(lst):
+            if not isinstance(lst, list):
+                return []
+            cleaned_items = []
+            for item in lst:
+                if item is not None and item != 'NaN' and item != 'undefined' and str(item).strip() != '':
+                    cleaned_items.append(clean_text(item))
+            return cleaned_items if cleaned_items else ['Consult with legal counsel']
         
-        try:
-            # Try models in order of preference
-            models_to_try = ["gpt-4o-mini", "gpt-3.5-turbo", "gpt-4"]
-            response = None
+        def validate_advice_data(data):
+            """Validate and clean the advice data structure"""
+            if not isinstance(data, dict):
+                return self._parse_fallback_response("Invalid response format")
             
-            for model in models_to_try:
-                try:
-                    response = self.client.chat.completions.create(
-                        model=model,
-                        messages=[{"role": "user", "content": irac_prompt}],
-                        temperature=0.1,
-                        max_tokens=2000
-                    )
-                    break
-                except Exception as e:
-                    if "model_not_found" in str(e) or "does not exist" in str(e):
-                        print(f"Model {model} not available, trying next...")
-                        continue
+            # Ensure all required fields exist and are properly formatted
+            validated = {}
+            for key in ['issue', 'rule', 'analysis', 'conclusion', 'risk_level', 'recommendations']:
+                if key in data:
+                    if key == 'recommendations':
+                        validated[key] = clean_list(data[key])
                     else:
-                        raise e
-            
-            if response is None:
-                raise Exception("No available models found")
-            
-            content = response.choices[0].message.content.strip()
-            
-            # Extract JSON from response with better pattern matching
-            json_patterns = [
-                r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}',  # More precise JSON object pattern
-                r'\{.*\}',  # Fallback to original pattern
-            ]
-            
-            advice_data = None
-            for pattern in json_patterns:
-                json_match = re.search(pattern, content, re.DOTALL)
-                if json_match:
-                    try:
-                        # Clean the JSON string to handle all NaN variations
-                        json_str = json_match.group()
-                        
-                        # Replace all possible NaN variations
-                        json_str = re.sub(r'\bNaN\b', 'null', json_str)
-                        json_str = re.sub(r'\bundefined\b', 'null', json_str)
-                        json_str = re.sub(r'\bnull\b', 'null', json_str)
-                        
-                        # Remove any remaining problematic values
-                        json_str = re.sub(r':\s*NaN\s*', ': null', json_str)
-                        json_str = re.sub(r':\s*undefined\s*', ': null', json_str)
-                        
-                        # Try to parse the cleaned JSON
-                        advice_data = json.loads(json_str)
-                        break  # Success, exit the loop
-                        
-                    except json.JSONDecodeError as e:
-                        print(f"JSON parsing error with pattern {pattern}: {e}")
-                        print(f"Problematic JSON: {json_str[:200]}...")
-                        continue  # Try next pattern
-            
-            # If no JSON could be parsed, use fallback
-            if advice_data is None:
-                print("Using fallback response parsing")
-                advice_data = self._parse_fallback_response(content)
-            
-            # Clean and validate the advice data
-            def clean_text(text):
-                if text is None or text == 'NaN' or text == 'undefined' or str(text).strip() == '':
-                    return 'Information not available'
-                # Clean the text thoroughly
-                cleaned = str(text).replace('NaN', 'N/A').replace('undefined', 'N/A').strip()
-                return cleaned if cleaned else 'Information not available'
-            
-            def clean_list(lst):
-                if not isinstance(lst, list):
-                    return []
-                cleaned_items = []
-                for item in lst:
-                    if item is not None and item != 'NaN' and item != 'undefined' and str(item).strip() != '':
-                        cleaned_items.append(clean_text(item))
-                return cleaned_items if cleaned_items else ['Consult with legal counsel']
-            
-            def validate_advice_data(data):
-                """Validate and clean the advice data structure"""
-                if not isinstance(data, dict):
-                    return self._parse_fallback_response("Invalid response format")
-                
-                # Ensure all required fields exist and are properly formatted
-                validated = {}
-                for key in ['issue', 'rule', 'analysis', 'conclusion', 'risk_level', 'recommendations']:
-                    if key in data:
-                        if key == 'recommendations':
-                            validated[key] = clean_list(data[key])
-                        else:
-                            validated[key] = clean_text(data[key])
+                        validated[key] = clean_text(data[key])
+                else:
+                    # Provide default values for missing fields
+                    if key == 'recommendations':
+                        validated[key] = ['Consult with legal counsel']
                     else:
-                        # Provide default values for missing fields
-                        if key == 'recommendations':
-                            validated[key] = ['Consult with legal counsel']
-                        else:
-                            validated[key] = 'Information not available'
-                
-                return validated
-            
-            # Validate the advice data
-            advice_data = validate_advice_data(advice_data)
+                        validated[key] = 'Information not available'
             
-            return LegalAdvice(
-                issue=advice_data['issue'],
-                rule=advice_data['rule'],
-                analysis=advice_data['analysis'],
-                conclusion=advice_data['conclusion'],
-                relevant_sections=relevant_sections,
-                risk_level=advice_data['risk_level'],
-                recommendations=advice_data['recommendations']
-            )
-            
-        except Exception as e:
-            print(f"Error generating legal advice: {e}")
-            return self._create_error_advice(relevant_sections, str(e))
+            return validated
+        
+        # Validate the advice data
+        advice_data = validate_advice_data(advice_data)
+        
+        return LegalAdvice(
+            issue=advice_data['issue'],
+            rule=advice_data['rule'],
+            analysis=advice_data['analysis'],
+            conclusion=advice_data['conclusion'],
+            relevant_sections=relevant_sections,
+            risk_level=advice_data['risk_level'],
+            recommendations=advice_data['recommendations']
+        )
+    
+    def _extract_json(self, content: str) -> Optional[Dict[str, Any]]:
+        """Extract and parse a JSON object embedded in free-form reply text"""
+        # Extract JSON from response with better pattern matching
+        for pattern in _RE_JSON_OBJECTS:
+            json_match = pattern.search(content)
+            if json_match:
+                try:
+                    # Clean the JSON string to handle all NaN variations
+                    json_str = json_match.group()
+                    
+                    # Replace NaN and undefined, which are not valid JSON
+                    json_str = _RE_NAN.sub('null', json_str)
+                    json_str = _RE_UNDEFINED.sub('null', json_str)
+                    
+                    # Try to parse the cleaned JSON
+                    return json.loads(json_str)
+                    
+                except json.JSONDecodeError as e:
+                    print(f"JSON parsing error with pattern {pattern.pattern}: {e}")
+                    print(f"Problematic JSON: {json_str[:200]}...")
+                    continue  # Try next pattern
+        return None
     
     def _parse_fallback_response(self, content: str) -> Dict[str, Any]:
         """Fallback method to parse non-JSON responses"""
@@ -433,6 +1217,18 @@ class PDPALegalAdvisor:
             'recommendations': recommendations
         }
     
+    def _create_invalid_scenario_advice(self, reason: str) -> LegalAdvice:
+        """Create advice explaining why a non-legal scenario was rejected"""
+        return LegalAdvice(
+            issue="Input validation failed",
+            rule="The PDPA Legal Advisor is designed for data protection and privacy law scenarios only",
+            analysis=reason,
+            conclusion="Please provide a scenario involving personal data, privacy, or legal compliance issues.",
+            relevant_sections=[],
+            risk_level="N/A",
+            recommendations=["Provide a legal scenario involving data protection", "Include details about personal data handling", "Describe privacy or compliance concerns"]
+        )
+    
     def _create_error_advice(self, sections: List[Dict], error: str) -> LegalAdvice:
         """Create error advice when generation fails"""
         return LegalAdvice(
@@ -447,36 +1243,21 @@ class PDPALegalAdvisor:
     
     def format_advice(self, advice: LegalAdvice) -> str:
         """Format legal advice for display"""
-        output = f"""
-╔══════════════════════════════════════════════════════════════════════════════╗
-║                           PDPA LEGAL ADVICE REPORT                          ║
-╚══════════════════════════════════════════════════════════════════════════════╝
-
-🔍 ISSUE:
-{advice.issue}
-
-📋 RULE:
-{advice.rule}
-
-🔬 ANALYSIS:
-{advice.analysis}
-
-✅ CONCLUSION:
-{advice.conclusion}
-
-⚠️  RISK LEVEL: {advice.risk_level.upper()}
-
-📚 RELEVANT SECTIONS:
-"""
-        for section in advice.relevant_sections:
-            output += f"\n• Section {section['section_number']}: {section['title']}"
+        parts = [ADVICE_REPORT_HEADER.format(
+            issue=advice.issue,
+            rule=advice.rule,
+            analysis=advice.analysis,
+            conclusion=advice.conclusion,
+            risk_level=advice.risk_level.upper(),
+        )]
+        parts.extend(f"\n• Section {section['section_number']}: {section['title']}"
+                     for section in advice.relevant_sections)
         
         if advice.recommendations:
-            output += f"\n\n💡 RECOMMENDATIONS:\n"
-            for i, rec in enumerate(advice.recommendations, 1):
-                output += f"{i}. {rec}\n"
+            parts.append("\n\n💡 RECOMMENDATIONS:\n")
+            parts.extend(f"{i}. {rec}\n" for i, rec in enumerate(advice.recommendations, 1))
         
-        return output
+        return "".join(parts)
 
 def main():
     """Main function for command-line usage"""
@@ -486,6 +1267,7 @@ def main():
     parser.add_argument("scenario", help="Factual scenario to analyze")
     parser.add_argument("--csv", default="pdpa_sections.csv", help="Path to PDPA sections CSV")
     parser.add_argument("--api-key", help="OpenAI API key (or set OPENAI_API_KEY env var)")
+    parser.add_argument("--stream", action="store_true", help="Show the model's reply as it is generated")
     
     args = parser.parse_args()
     
@@ -495,7 +1277,15 @@ def main():
         
         # Generate advice
         print("🔍 Analyzing scenario...")
-        advice = advisor.generate_legal_advice(args.scenario)
+        if args.stream:
+            for item in advisor.generate_legal_advice_stream(args.scenario):
+                if isinstance(item, LegalAdvice):
+                    advice = item
+                else:
+                    print(item, end="", flush=True)
+            print()
+        else:
+            advice = advisor.generate_legal_advice(args.scenario)
         
         # Display results
         print(advisor.format_advice(advice))
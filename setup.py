@@ -6,12 +6,16 @@ Setup script for PDPA Legal Advisor
 import subprocess
 import sys
 import os
+from env import get_env
 
 def install_requirements():
     """Install required packages"""
     print("📦 Installing required packages...")
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        # Prefer wheels over building sdists, and skip pip's self-update check
+        # pip writes straight to this terminal, nothing is buffered here
+        subprocess.run([sys.executable, "-m", "pip", "install", "--prefer-binary",
+                        "--disable-pip-version-check", "-r", "requirements.txt"], check=True)
         print("✅ Requirements installed successfully!")
         return True
     except subprocess.CalledProcessError as e:
@@ -20,7 +24,7 @@ def install_requirements():
 
 def check_api_key():
     """Check if OpenAI API key is set"""
-    api_key = os.getenv("OPENAI_API_KEY")
+    api_key = get_env("OPENAI_API_KEY")
     if not api_key:
         print("⚠️  OPENAI_API_KEY environment variable not set!")
         print("   Please set your OpenAI API key:")
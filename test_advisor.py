@@ -3,9 +3,9 @@
 Test script for PDPA Legal Advisor
 """
 
-import os
 import sys
 from pdpa_legal_advisor import PDPALegalAdvisor
+from env import get_env
 
 def test_basic_functionality():
     """Test basic functionality without OpenAI API"""
@@ -15,7 +15,7 @@ def test_basic_functionality():
         # Test CSV loading
         print("1. Testing CSV data loading...")
         advisor = PDPALegalAdvisor("pdpa_sections.csv", api_key="test-key")
-        print(f"   ✅ Loaded {len(advisor.df)} sections from CSV")
+        print(f"   ✅ Loaded {len(advisor._rows)} sections from CSV")
         
         # Test section search (without API call)
         print("2. Testing section search...")
@@ -24,9 +24,9 @@ def test_basic_functionality():
         
         # Test data structure
         print("3. Testing data structure...")
-        if not advisor.df.empty:
-            print(f"   ✅ CSV has columns: {list(advisor.df.columns)}")
-            print(f"   ✅ Sample section: {advisor.df.iloc[0]['section_number']}")
+        if advisor._rows:
+            print(f"   ✅ CSV has columns: {list(advisor._rows[0])}")
+            print(f"   ✅ Sample section: {advisor._rows[0]['section_number']}")
         else:
             print("   ❌ CSV is empty")
             return False
@@ -40,7 +40,7 @@ def test_basic_functionality():
 
 def test_with_api():
     """Test with actual OpenAI API (if available)"""
-    api_key = os.getenv("OPENAI_API_KEY")
+    api_key = get_env("OPENAI_API_KEY")
     if not api_key:
         print("⚠️  OPENAI_API_KEY not set, skipping API test")
         return True
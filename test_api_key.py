@@ -3,14 +3,29 @@
 Simple script to test your OpenAI API key
 """
 
-import os
-import openai
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from env import get_env
+
+def probe_model(client, model):
+    """Send a test request to a model, returning None if the model is unavailable"""
+    try:
+        return client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": "Say 'Hello, API test successful!'"}],
+            max_tokens=50,
+            temperature=0
+        )
+    except Exception as e:
+        if "model_not_found" in str(e) or "does not exist" in str(e):
+            print(f"   Model {model} not available")
+            return None
+        raise
 
 def test_api_key():
     """Test if the OpenAI API key is working"""
     
     # Check if API key is set
-    api_key = os.getenv("OPENAI_API_KEY")
+    api_key = get_env("OPENAI_API_KEY")
     if not api_key:
         print("❌ OPENAI_API_KEY environment variable not set!")
         print("\n💡 To set your API key, run:")
@@ -26,6 +41,7 @@ def test_api_key():
         # Test the API with a simple request
         print("🔍 Testing API connection...")
         
+        import openai
         client = openai.OpenAI(api_key=api_key)
         
         # Try different models to see which ones are available
@@ -33,22 +49,28 @@ def test_api_key():
         response = None
         used_model = None
         
-        for model in models_to_try:
-            try:
-                response = client.chat.completions.create(
-                    model=model,
-                    messages=[{"role": "user", "content": "Say 'Hello, API test successful!'"}],
-                    max_tokens=50,
-                    temperature=0
-                )
-                used_model = model
-                break
-            except Exception as e:
-                if "model_not_found" in str(e) or "does not exist" in str(e):
-                    print(f"   Model {model} not available, trying next...")
+        # Probe all models at once and use whichever answers first
+        executor = ThreadPoolExecutor(max_workers=len(models_to_try))
+        try:
+            futures = {executor.submit(probe_model, client, model): model for model in models_to_try}
+            errors = []
+            for future in as_completed(futures):
+                try:
+                    response = future.result()
+                except Exception as e:
+                    # Another model may still answer, e.g. when one is rate limited
+                    print(f"   Model {futures[future]} failed: {e}")
+                    errors.append(e)
                     continue
-                else:
-                    raise e
+                if response is not None:
+                    used_model = futures[future]
+                    break
+        finally:
+            # Don't wait for the slower probes once one has succeeded
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        if response is None and errors:
+            raise errors[0]
         
         if response is None:
             raise Exception("No available models found")
@@ -3,18 +3,18 @@
 Minimal test to check if the API works with quota limitations
 """
 
-import os
-import openai
+from env import get_env
 
 def test_minimal_api():
     """Test with the most minimal API call possible"""
     
-    api_key = os.getenv("OPENAI_API_KEY")
+    api_key = get_env("OPENAI_API_KEY")
     if not api_key:
         print("❌ API key not set")
         return False
     
     try:
+        import openai
         client = openai.OpenAI(api_key=api_key)
         
         # Try the most minimal request possible
@@ -3,23 +3,40 @@
 Test script to verify web server is working
 """
 
+import asyncio
 import requests
 import time
 import subprocess
 import sys
 
+# Common ports to test
+PORTS_TO_TEST = [5000, 5001, 5002, 6000, 7000, 8000, 9000]
+
+# Pauses between readiness checks while a started server boots
+READY_POLL_DELAYS = (0.1, 0.2, 0.4, 0.8, 1.6, 3.2)
+
+async def probe_ports(ports):
+    """Request /health on every port at once, returning each response or exception"""
+    return await asyncio.gather(
+        *[asyncio.to_thread(requests.get, f"http://localhost:{port}/health", timeout=2) for port in ports],
+        return_exceptions=True
+    )
+
 def test_web_server():
     """Test if the web server is accessible"""
     
-    # Common ports to test
-    ports_to_test = [5000, 5001, 5002, 6000, 7000, 8000, 9000]
+    ports_to_test = PORTS_TO_TEST
     
     print("🔍 Testing web server connectivity...")
     
-    for port in ports_to_test:
+    responses = asyncio.run(probe_ports(ports_to_test))
+    
+    # Report in port order, so the first working port is preferred
+    for port, response in zip(ports_to_test, responses):
         try:
             print(f"   Testing port {port}...", end=" ")
-            response = requests.get(f"http://localhost:{port}/health", timeout=2)
+            if isinstance(response, Exception):
+                raise response
             if response.status_code == 200:
                 print("✅ Working!")
                 data = response.json()
@@ -39,16 +56,28 @@ def test_web_server():
     print("   python3 web_interface.py")
     return None
 
+def wait_for_server(ports=PORTS_TO_TEST):
+    """Poll /health on the ports with backoff until one responds, returning whether any did"""
+    for delay in READY_POLL_DELAYS:
+        responses = asyncio.run(probe_ports(ports))
+        if any(not isinstance(r, Exception) and r.status_code == 200 for r in responses):
+            return True
+        time.sleep(delay)
+    return False
+
 def start_web_server():
     """Start the web server in background"""
     print("🚀 Starting web server...")
     try:
-        process = subprocess.Popen([sys.executable, "web_interface.py"], 
-                                 stdout=subprocess.PIPE, 
-                                 stderr=subprocess.PIPE)
+        # Output is discarded rather than piped: nothing reads it, and a
+        # full pipe would block the server once it logs enough requests
+        process = subprocess.Popen([sys.executable, "web_interface.py"],
+                                   stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL)
         print("✅ Web server started in background")
-        print("⏳ Waiting 5 seconds for server to initialize...")
-        time.sleep(5)
+        print("⏳ Waiting for server to initialize...")
+        if not wait_for_server():
+            print("⚠️  Server did not respond to health checks yet")
         return process
     except Exception as e:
         print(f"❌ Failed to start web server: {e}")
@@ -3,43 +3,141 @@
 Web interface for PDPA Legal Advisor using Flask
 """
 
-from flask import Flask, render_template, request, jsonify
-from pdpa_legal_advisor import PDPALegalAdvisor
+from flask import Flask, render_template, request, jsonify, make_response, Response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from pdpa_legal_advisor import PDPALegalAdvisor, LegalAdvice
+import functools
+import hashlib
+import threading
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:  # Optional: without it responses are encoded with the stdlib json module
+    orjson = None
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+if orjson:
+    app.json = ORJSONProvider(app)
+
+PDPA_CSV_PATH = "pdpa_sections.csv"
+
+# Scenarios of a batch /analyze request are analyzed concurrently, since each
+# one mostly waits on OpenAI
+MAX_BATCH_WORKERS = 8
+# Largest batch accepted, so one request can't queue more LLM calls than
+# finish within a worker timeout
+MAX_BATCH_SIZE = 16
+_batch_executor = ThreadPoolExecutor(max_workers=MAX_BATCH_WORKERS)
 
-# Initialize the advisor
+# The advisor is created on first use rather than at import, so workers
+# start without parsing the CSV
 advisor = None
 advisor_ready = False
+advisor_mtime = None
+_advisor_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def _load_advisor(csv_path, mtime):
+    """Build an advisor for one version (path and modification time) of the CSV"""
+    return PDPALegalAdvisor(csv_path)
 
 def init_advisor():
     """Initialize the advisor with proper error handling"""
-    global advisor, advisor_ready
+    global advisor, advisor_ready, advisor_mtime
     try:
-        advisor = PDPALegalAdvisor("pdpa_sections.csv")
+        mtime = os.path.getmtime(PDPA_CSV_PATH)
+        # Unchanged CSV: reuse the cached advisor; changed: drop the stale one
+        if advisor_mtime is not None and advisor_mtime != mtime:
+            _load_advisor.cache_clear()
+        advisor = _load_advisor(PDPA_CSV_PATH, mtime)
+        advisor_mtime = mtime
         advisor_ready = True
         print("✅ PDPA Legal Advisor initialized successfully!")
     except Exception as e:
         print(f"❌ Error initializing advisor: {e}")
         advisor_ready = False
 
-# Initialize on startup
-init_advisor()
+def get_advisor():
+    """The shared advisor, initializing it on first use"""
+    if not advisor_ready:
+        with _advisor_lock:
+            if not advisor_ready:
+                init_advisor()
+    return advisor
+
+def advice_to_dict(advice):
+    """Convert legal advice to a JSON-serializable format"""
+    return {
+        'issue': advice.issue,
+        'rule': advice.rule,
+        'analysis': advice.analysis,
+        'conclusion': advice.conclusion,
+        'risk_level': advice.risk_level,
+        'recommendations': advice.recommendations,
+        'relevant_sections': advice.relevant_sections
+    }
+
+def status_etag():
+    """ETag for responses that only change when the advisor's state does"""
+    return hashlib.md5(f"{advisor_ready}:{advisor_mtime}".encode()).hexdigest()
+
+def conditional_response(build):
+    """
+    Respond with 304 Not Modified if the client already has the current
+    version, otherwise build the response and tag it
+    
+    Args:
+        build: Callable returning the full response body
+    """
+    etag = status_etag()
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(build())
+    response.set_etag(etag)
+    return response
 
 @app.route('/')
 def index():
     """Main page"""
-    return render_template('index.html', advisor_ready=advisor_ready)
+    # Tagged from the rendered page rather than the advisor's state, so
+    # clients revalidating also pick up changes to the page itself
+    response = make_response(render_template('index.html', advisor_ready=advisor_ready))
+    response.add_etag()
+    return response.make_conditional(request)
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
     """Analyze a legal scenario"""
+    advisor = get_advisor()
     if not advisor_ready:
         return jsonify({'error': 'Advisor not ready. Please check configuration.'}), 500
     
     try:
         data = request.get_json()
+        
+        # A list of scenarios is analyzed as one batch
+        scenarios = data.get('scenarios')
+        if scenarios is not None:
+            if (not isinstance(scenarios, list) or not scenarios
+                    or not all(isinstance(s, str) and s for s in scenarios)):
+                return jsonify({'error': 'scenarios must be a non-empty list of scenario strings'}), 400
+            if len(scenarios) > MAX_BATCH_SIZE:
+                return jsonify({'error': f'At most {MAX_BATCH_SIZE} scenarios can be analyzed per request'}), 400
+            results = _batch_executor.map(advisor.generate_legal_advice, scenarios)
+            return jsonify([advice_to_dict(advice) for advice in results])
+        
         scenario = data.get('scenario', '')
         
         if not scenario:
@@ -48,36 +146,63 @@ def analyze():
         # Generate legal advice
         advice = advisor.generate_legal_advice(scenario)
         
-        # Convert to JSON-serializable format
-        result = {
-            'issue': advice.issue,
-            'rule': advice.rule,
-            'analysis': advice.analysis,
-            'conclusion': advice.conclusion,
-            'risk_level': advice.risk_level,
-            'recommendations': advice.recommendations,
-            'relevant_sections': advice.relevant_sections
-        }
-        
-        return jsonify(result)
+        return jsonify(advice_to_dict(advice))
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def sse_event(data, event=None):
+    """Frame data as a server-sent event, JSON-encoding it"""
+    frame = f"data: {app.json.dumps(data)}\n\n"
+    return f"event: {event}\n{frame}" if event else frame
+
+@app.route('/analyze_stream', methods=['POST'])
+def analyze_stream():
+    """
+    Analyze a legal scenario, streaming the reply as server-sent events
+    
+    The scenario is posted as JSON like /analyze, keeping it out of URLs and
+    access logs. Unnamed events carry chunks of the LLM's reply as it is
+    generated; the final 'advice' event carries the complete advice, or an
+    'analysis_error' event reports a failure.
+    """
+    advisor = get_advisor()
+    if not advisor_ready:
+        return jsonify({'error': 'Advisor not ready. Please check configuration.'}), 500
+    
+    data = request.get_json(silent=True) or {}
+    scenario = data.get('scenario', '')
+    if not scenario or not isinstance(scenario, str):
+        return jsonify({'error': 'No scenario provided'}), 400
+    
+    def generate():
+        try:
+            for item in advisor.generate_legal_advice_stream(scenario):
+                if isinstance(item, LegalAdvice):
+                    yield sse_event(advice_to_dict(item), 'advice')
+                else:
+                    yield sse_event(item)
+        except Exception as e:
+            yield sse_event({'error': str(e)}, 'analysis_error')
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache'})
+
 @app.route('/health')
 def health():
     """Health check endpoint"""
-    return jsonify({
+    get_advisor()
+    return conditional_response(lambda: jsonify({
         'status': 'healthy' if advisor_ready else 'unhealthy',
         'advisor_ready': advisor_ready
-    })
+    }))
 
 @app.route('/reinit', methods=['POST'])
 def reinit():
     """Reinitialize the advisor"""
-    global advisor, advisor_ready
     try:
-        init_advisor()
+        with _advisor_lock:
+            init_advisor()
         return jsonify({
             'success': True,
             'message': 'Advisor reinitialized successfully' if advisor_ready else 'Failed to initialize advisor',
@@ -91,27 +216,25 @@ def reinit():
         }), 500
 
 if __name__ == '__main__':
-    # Try different ports if 5000 is in use
     import socket
+    from werkzeug.serving import make_server
     
-    def find_free_port():
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.bind(('', 0))
-            s.listen(1)
-            port = s.getsockname()[1]
-        return port
-    
-    port = 5000
+    # Bind the listening socket once and serve from it, so there is no gap
+    # between checking a port and using it. Falls back to any free port if
+    # 5000 is in use
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     try:
-        # Test if port 5000 is available
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.bind(('', 5000))
-        print(f"🚀 Starting web interface on port {port}")
+        sock.bind(('127.0.0.1', 5000))
+        print("🚀 Starting web interface on port 5000")
     except OSError:
-        port = find_free_port()
-        print(f"⚠️  Port 5000 in use, using port {port}")
+        sock.bind(('127.0.0.1', 0))
+        print(f"⚠️  Port 5000 in use, using port {sock.getsockname()[1]}")
+    sock.listen()
+    port = sock.getsockname()[1]
+    server = make_server('127.0.0.1', port, app, threaded=True, fd=sock.fileno())
     
     print(f"🌐 Open your browser to: http://localhost:{port}")
     print(f"🌐 Alternative URL: http://127.0.0.1:{port}")
     print(f"🌐 Network URL: http://10.119.143.159:{port}")
-    app.run(debug=True, host='127.0.0.1', port=port)
+    server.serve_forever()